@@ -2,10 +2,20 @@
 Benchmark runner - orchestrates testing across different engines
 """
 
+import asyncio
+import atexit
+import functools
+import io
+import shutil
+import sys
+import threading
 import time
 import subprocess
 from typing import List, Dict, Any
+from collections import deque
+from dataclasses import asdict
 from datetime import datetime
+from types import MappingProxyType
 import os
 
 try:
@@ -23,18 +33,93 @@ try:
 except ImportError:
     docker = None
 
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
 from config import (
     SUPPORTED_MODELS, ENGINE_CONFIGS, PRESETS,
-    BENCHMARK_PROMPTS, DEFAULT_PROMPT
+    COMPILED_PROMPTS, DEFAULT_PROMPT
 )
 
 try:
-    from real_benchmark import run_benchmark_sync
+    from real_benchmark import run_real_benchmark, create_benchmark_session
     REAL_BENCHMARKING_AVAILABLE = True
 except ImportError:
     REAL_BENCHMARKING_AVAILABLE = False
 
 
+@functools.lru_cache(maxsize=1)
+def _gpu_available() -> bool:
+    """Check for a GPU once via NVML, falling back to nvidia-smi"""
+    if pynvml:
+        try:
+            pynvml.nvmlInit()
+            atexit.register(pynvml.nvmlShutdown)
+            return pynvml.nvmlDeviceGetCount() > 0
+        except Exception:
+            return False
+
+    # No pynvml — check PATH first so driverless machines skip the
+    # fork/exec entirely, then pay the subprocess cost at most once
+    nvidia_smi = shutil.which('nvidia-smi')
+    if not nvidia_smi:
+        return False
+
+    try:
+        result = subprocess.run(
+            [nvidia_smi],
+            capture_output=True,
+            timeout=5
+        )
+        return result.returncode == 0
+    except:
+        return False
+
+
+# Engine base URLs are fully determined by ENGINE_CONFIGS — build the
+# strings once at import and intern them
+_ENGINE_URLS = MappingProxyType({
+    engine: sys.intern(f"http://localhost:{cfg.port}")
+    for engine, cfg in ENGINE_CONFIGS.items()
+})
+
+
+def _cgroup_memory_limit():
+    """Read the cgroup memory limit if one applies (container-aware)"""
+    # cgroup v2 first, then v1
+    for path in ('/sys/fs/cgroup/memory.max',
+                 '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                raw = f.read().strip()
+        except OSError:
+            continue
+        # v2 reports 'max' and v1 a huge sentinel when unlimited
+        if raw.isdigit() and int(raw) < (1 << 60):
+            return int(raw)
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _host_resources() -> tuple:
+    """Return (cpu_count, memory_gb) — cached, the host doesn't change mid-run"""
+    # Scheduling affinity reflects cgroup/container CPU limits, which
+    # psutil.cpu_count() (host-wide) does not
+    try:
+        cpu_count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpu_count = (psutil.cpu_count() if psutil else os.cpu_count()) or 4
+
+    memory_bytes = _cgroup_memory_limit()
+    if memory_bytes is None and psutil:
+        memory_bytes = psutil.virtual_memory().total
+    memory_gb = round(memory_bytes / (1024**3), 1) if memory_bytes else 8.0
+
+    return cpu_count, memory_gb
+
+
 class BenchmarkRunner:
     """Runs benchmarks across multiple engines and concurrency levels"""
 
@@ -60,26 +145,59 @@ class BenchmarkRunner:
         # Apply preset if specified
         if preset and preset in PRESETS:
             preset_config = PRESETS[preset]
-            self.concurrency_levels = preset_config['concurrency']
-            self.duration = preset_config['duration']
-            self.prompt_style = preset_config['prompt_style']
+            self.concurrency_levels = list(preset_config.concurrency)
+            self.duration = preset_config.duration
+            self.prompt_style = preset_config.prompt_style
         else:
             self.prompt_style = 'mixed'
 
-        # Get prompts
+        # Get prompts (kept as a tuple — immutable and safe to share)
+        # with their lengths precomputed alongside
         if custom_prompt:
-            self.prompts = [custom_prompt]
+            self.prompts = (custom_prompt,)
+            self.prompt_lens = (len(custom_prompt),)
         else:
-            self.prompts = BENCHMARK_PROMPTS.get(
-                self.prompt_style, [DEFAULT_PROMPT])
+            self.prompts, self.prompt_lens = COMPILED_PROMPTS.get(
+                self.prompt_style,
+                ((DEFAULT_PROMPT,), (len(DEFAULT_PROMPT),)))
+
+        # Cached process handle so repeated sampling avoids re-resolving the PID
+        self._proc = psutil.Process() if psutil else None
+        if psutil:
+            # Prime cpu_percent so later non-blocking calls return real deltas
+            psutil.cpu_percent(interval=None)
+
+        # Background sampler keeps fresh CPU/RSS readings so the hot path
+        # only reads an attribute instead of blocking on psutil. A short
+        # window of samples is kept so readings are smoothed, not spiky.
+        self._cpu_samples = deque(maxlen=3)
+        self._memory_sample = 0
+        self._sampler_stop = threading.Event()
+        self._sampler = None
+        if psutil:
+            self._sampler = threading.Thread(
+                target=self._sample_loop, daemon=True)
+            self._sampler.start()
+
+        # Bind the benchmark entry point once — instance-attribute access
+        # on the hot path instead of a global lookup per call
+        self._run_fn = run_real_benchmark if REAL_BENCHMARKING_AVAILABLE else None
+
+        # Resolve engine configs and base URLs once instead of per benchmark
+        self._engine_endpoints = {
+            engine: (ENGINE_CONFIGS[engine], _ENGINE_URLS[engine])
+            for engine in engines
+        }
 
         # System info
         self.system_info = self._get_system_info()
 
-        # Docker client
-        if docker:
+        # Docker client — only negotiate with the daemon if the socket
+        # actually exists, and cap the handshake so a stuck daemon
+        # can't hang startup
+        if docker and os.path.exists('/var/run/docker.sock'):
             try:
-                self.docker_client = docker.from_env()
+                self.docker_client = docker.from_env(timeout=2)
             except:
                 self.docker_client = None
         else:
@@ -87,12 +205,7 @@ class BenchmarkRunner:
 
     def _get_system_info(self) -> Dict[str, Any]:
         """Gather system information"""
-        if psutil:
-            cpu_count = psutil.cpu_count()
-            memory_gb = round(psutil.virtual_memory().total / (1024**3), 1)
-        else:
-            cpu_count = os.cpu_count() or 4
-            memory_gb = 8.0
+        cpu_count, memory_gb = _host_resources()
 
         return {
             'cpu_count': cpu_count,
@@ -102,112 +215,178 @@ class BenchmarkRunner:
             'timestamp': datetime.utcnow().isoformat(),
         }
 
+    def _sample_loop(self):
+        """Tick CPU and RSS samples once per second until stopped"""
+        while not self._sampler_stop.is_set():
+            # interval=1.0 blocks this thread only and doubles as the tick
+            self._cpu_samples.append(psutil.cpu_percent(interval=1.0))
+            self._memory_sample = self._proc.memory_info().rss
+
     def _check_gpu(self) -> bool:
         """Check if GPU is available"""
-        try:
-            result = subprocess.run(
-                ['nvidia-smi'],
-                capture_output=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except:
-            return False
+        return _gpu_available()
 
     def run(self) -> Dict[str, Any]:
         """Run all benchmarks"""
+        try:
+            return asyncio.run(self._run_all())
+        finally:
+            self._sampler_stop.set()
+
+    async def _run_all(self) -> Dict[str, Any]:
+        """Execute the full engine × concurrency sweep"""
+        # One wall-clock snapshot per run — per-row timestamps are captured
+        # as cheap time_ns() integers and formatted once at the end
+        run_started_iso = datetime.utcnow().isoformat()
+
         results = {
             'metadata': {
                 'model': self.model,
-                'model_info': self.model_info,
+                # Results round-trip through JSON, so keep a plain dict here
+                'model_info': asdict(self.model_info),
                 'engines': self.engines,
                 'concurrency_levels': self.concurrency_levels,
                 'duration': self.duration,
                 'preset': self.preset,
                 'system_info': self.system_info,
-                'timestamp': datetime.utcnow().isoformat(),
+                'timestamp': run_started_iso,
             },
             'benchmarks': []
         }
 
-        for engine in self.engines:
-            print(f"\n{'=' * 60}")
-            print(f"🔧 Testing {engine}")
-            print(f"{'=' * 60}")
+        # Engines listen on separate ports, so their sweeps can overlap.
+        # Concurrency levels against the same engine stay sequential inside
+        # _run_engine — overlapping them would pollute each other's numbers.
+        per_engine = await asyncio.gather(
+            *(self._run_engine(engine) for engine in self.engines))
 
-            # Setup engine (skip if requested)
-            if not self.skip_setup:
-                print(f"⏳ Setting up {engine}...")
-                try:
-                    self._setup_engine(engine)
-                    print(f"✅ {engine} ready")
-                except Exception as e:
-                    print(f"❌ Failed to setup {engine}: {e}")
-                    continue
+        for engine_results in per_engine:
+            results['benchmarks'].extend(engine_results)
+
+        # Format the deferred per-row timestamps in one pass
+        for bench in results['benchmarks']:
+            ns = bench.pop('_timestamp_ns')
+            bench['timestamp'] = datetime.utcfromtimestamp(ns / 1e9).isoformat()
+
+        return results
+
+    @staticmethod
+    def _flush_log(buf: io.StringIO):
+        """Emit buffered progress lines in a single stdout write"""
+        text = buf.getvalue()
+        if text:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            buf.truncate(0)
+            buf.seek(0)
+
+    async def _run_engine(self, engine: str) -> List[Dict[str, Any]]:
+        """Setup one engine and sweep its concurrency levels sequentially"""
+        # Buffer progress per engine: one syscall per block instead of one
+        # per print, and concurrent engine tasks don't interleave lines
+        buf = io.StringIO()
+        buf.write(f"\n{'=' * 60}\n")
+        buf.write(f"🔧 Testing {engine}\n")
+        buf.write(f"{'=' * 60}\n")
+
+        # Setup engine (skip if requested)
+        if not self.skip_setup:
+            buf.write(f"⏳ Setting up {engine}...\n")
+            try:
+                # Setup is blocking (docker/subprocess) — keep the loop free
+                await asyncio.to_thread(self._setup_engine, engine)
+                buf.write(f"✅ {engine} ready\n")
+            except Exception as e:
+                buf.write(f"❌ Failed to setup {engine}: {e}\n")
+                self._flush_log(buf)
+                return []
+        self._flush_log(buf)
+
+        engine_results = []
+
+        # One HTTP session serves every concurrency level of this engine —
+        # keep-alive sockets and the DNS cache survive between sweep steps
+        # instead of being torn down and re-handshaken per level
+        session = None
+        if REAL_BENCHMARKING_AVAILABLE:
+            session = create_benchmark_session(max(self.concurrency_levels))
 
+        try:
             # Run benchmarks for each concurrency level
             for concurrency in self.concurrency_levels:
-                print(f"\n  📊 Concurrency: {concurrency}")
-                print(f"  ⏱️  Duration: {self.duration}s")
+                buf.write(f"\n  📊 Concurrency: {concurrency}\n")
+                buf.write(f"  ⏱️  Duration: {self.duration}s\n")
 
                 try:
-                    benchmark_result = self._run_benchmark(
+                    benchmark_result = await self._run_benchmark(
                         engine,
-                        concurrency
+                        concurrency,
+                        session
                     )
-                    results['benchmarks'].append(benchmark_result)
+                    engine_results.append(benchmark_result)
 
-                    # Print quick summary
-                    print(
-                        f"  ✅ TTFT: {benchmark_result['metrics']['ttft_p50']:.3f}s")
-                    print(
-                        f"  ✅ Throughput: {benchmark_result['metrics']['tokens_per_sec']:.1f} tok/s")
-                    print(
-                        f"  ✅ Memory: {benchmark_result['metrics']['memory_mb']:.0f} MB")
+                    # Quick summary for this level
+                    metrics = benchmark_result['metrics']
+                    buf.write(f"  ✅ TTFT: {metrics['ttft_p50']:.3f}s\n")
+                    buf.write(
+                        f"  ✅ Throughput: {metrics['tokens_per_sec']:.1f} tok/s\n")
+                    buf.write(f"  ✅ Memory: {metrics['memory_mb']} MB\n")
 
                 except Exception as e:
-                    print(f"  ❌ Benchmark failed: {e}")
+                    buf.write(f"  ❌ Benchmark failed: {e}\n")
+                    self._flush_log(buf)
                     raise
 
-            # Cleanup
-            if not self.skip_setup:
-                try:
-                    self._cleanup_engine(engine)
-                except:
-                    pass
+                self._flush_log(buf)
+        finally:
+            if session is not None:
+                await session.close()
 
-        return results
+        # Cleanup
+        if not self.skip_setup:
+            try:
+                self._cleanup_engine(engine)
+            except:
+                pass
+
+        return engine_results
 
     def _setup_engine(self, engine: str):
-        """Setup and start an engine"""
-        from engine_setup import EngineSetup
+        """Setup and start an engine, waiting until it answers health checks"""
+        from engine_setup import EngineSetup, _wait_for_health
 
         setup = EngineSetup()
         setup.setup(engine, self.model)
 
+        config = ENGINE_CONFIGS[engine]
+        health_url = f"http://localhost:{config.port}{config.health_endpoint}"
+        if not _wait_for_health(health_url):
+            raise RuntimeError(f"{engine} did not become healthy at {health_url}")
+
     def _cleanup_engine(self, engine: str):
         """Stop and cleanup an engine"""
         pass
 
-    def _run_benchmark(self, engine: str, concurrency: int) -> Dict[str, Any]:
+    async def _run_benchmark(self, engine: str, concurrency: int,
+                             session=None) -> Dict[str, Any]:
         """Run benchmark for a specific engine and concurrency level"""
 
-        if not REAL_BENCHMARKING_AVAILABLE:
+        if self._run_fn is None:
             raise RuntimeError(
                 "Real benchmarking not available. Install: pip install aiohttp")
 
-        # Get engine config
-        config = ENGINE_CONFIGS[engine]
-        base_url = f"http://localhost:{config['port']}"
+        # Get engine config (resolved once in __init__)
+        config, base_url = self._engine_endpoints[engine]
 
         # Run real benchmark
-        real_results = run_benchmark_sync(
+        real_results = await self._run_fn(
             engine=engine,
             base_url=base_url,
             model_name=self.model,
             prompts=self.prompts,
             concurrency=concurrency,
-            duration=self.duration
+            duration=self.duration,
+            session=session
         )
 
         if not real_results:
@@ -233,18 +412,24 @@ class BenchmarkRunner:
                 'memory_mb': memory_mb,
                 'cpu_percent': self._get_cpu_usage(),
             },
-            'timestamp': datetime.utcnow().isoformat(),
+            '_timestamp_ns': time.time_ns(),
         }
 
-    def _get_memory_usage(self) -> float:
-        """Get current memory usage in MB"""
-        if psutil:
-            process = psutil.Process()
-            return round(process.memory_info().rss / (1024 * 1024), 0)
+    def _get_memory_usage(self) -> int:
+        """Get current memory usage in whole MB"""
+        if self._proc:
+            rss = self._memory_sample or self._proc.memory_info().rss
+            # RSS is a positive int — shift instead of float divide + round
+            return rss >> 20
         return 5000
 
     def _get_cpu_usage(self) -> float:
-        """Get current CPU usage percentage"""
+        """Get current CPU usage percentage (averaged over recent samples)"""
         if psutil:
-            return round(psutil.cpu_percent(interval=0.1), 1)
+            samples = tuple(self._cpu_samples)
+            if not samples:
+                # Sampler hasn't ticked yet — non-blocking read is safe
+                # because cpu_percent was primed in __init__
+                return round(psutil.cpu_percent(interval=None), 1)
+            return round(sum(samples) / len(samples), 1)
         return 75.0
@@ -6,6 +6,7 @@ import os
 import subprocess
 import time
 from pathlib import Path
+from types import MappingProxyType
 from config import SUPPORTED_MODELS, ENGINE_CONFIGS
 
 try:
@@ -15,6 +16,31 @@ except ImportError:
     DOCKER_AVAILABLE = False
 
 
+# Map our model names to Ollama names — built once at import, read-only
+_OLLAMA_MODEL_MAP = MappingProxyType({
+    'llama-3.1-8b': 'llama3.1',
+    'mistral-7b': 'mistral',
+    'qwen-2.5-7b': 'qwen2.5:7b',
+})
+
+
+def _wait_for_health(url: str, timeout: float = 30.0) -> bool:
+    """Poll a health endpoint with exponential backoff until it returns 200"""
+    import requests
+
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=0.5).status_code == 200:
+                return True
+        except Exception:
+            pass
+        time.sleep(delay)
+        delay = min(delay * 2, 1.0)
+    return False
+
+
 class EngineSetup:
     """Handles automatic engine setup and model downloading"""
 
@@ -22,9 +48,10 @@ class EngineSetup:
         self.models_dir = Path.home() / '.llamabench' / 'models'
         self.models_dir.mkdir(parents=True, exist_ok=True)
 
-        if DOCKER_AVAILABLE:
+        # Skip the daemon handshake entirely when the socket is absent
+        if DOCKER_AVAILABLE and os.path.exists('/var/run/docker.sock'):
             try:
-                self.docker_client = docker.from_env()
+                self.docker_client = docker.from_env(timeout=2)
             except:
                 self.docker_client = None
         else:
@@ -49,7 +76,7 @@ class EngineSetup:
         """Setup llama.cpp"""
 
         # Download GGUF model
-        print(f"📥 Downloading {model_info['gguf_file']}...")
+        print(f"📥 Downloading {model_info.gguf_file}...")
         model_path = self._download_gguf(model_info)
 
         if not self.docker_client:
@@ -75,7 +102,7 @@ class EngineSetup:
             ports={'8080/tcp': 8080},
             volumes={str(self.models_dir): {'bind': '/models', 'mode': 'ro'}},
             command=[
-                '--model', f'/models/{model_info["gguf_file"]}',
+                '--model', f'/models/{model_info.gguf_file}',
                 '--host', '0.0.0.0',
                 '--port', '8080',
                 '--n-gpu-layers', '99',
@@ -85,19 +112,12 @@ class EngineSetup:
             remove=True
         )
 
-        # Wait for health check
+        # Wait for health check — return as soon as the server answers
+        # instead of sleeping a fixed pessimistic interval
         print("⏳ Waiting for server to start...")
-        time.sleep(5)
-
-        # Verify
-        import requests
-        try:
-            response = requests.get('http://localhost:8080/health', timeout=5)
-            if response.status_code == 200:
-                print("✅ llama.cpp server running on http://localhost:8080")
-            else:
-                raise Exception("Health check failed")
-        except:
+        if _wait_for_health('http://localhost:8080/health'):
+            print("✅ llama.cpp server running on http://localhost:8080")
+        else:
             raise Exception("Server didn't start properly")
 
     def _setup_ollama(self, model_info):
@@ -117,16 +137,9 @@ class EngineSetup:
             )
 
         # Pull model
-        print(f"📥 Pulling {model_info['name']}...")
+        print(f"📥 Pulling {model_info.name}...")
 
-        # Map our model names to Ollama names
-        ollama_model_map = {
-            'llama-3.1-8b': 'llama3.1',
-            'mistral-7b': 'mistral',
-            'qwen-2.5-7b': 'qwen2.5:7b'
-        }
-
-        ollama_model = ollama_model_map.get(model_info.get('id'), 'llama3.1')
+        ollama_model = _OLLAMA_MODEL_MAP.get(model_info.id, 'llama3.1')
 
         result = subprocess.run(
             ['ollama', 'pull', ollama_model],
@@ -142,7 +155,7 @@ class EngineSetup:
     def _download_gguf(self, model_info):
         """Download GGUF model from HuggingFace"""
 
-        model_path = self.models_dir / model_info['gguf_file']
+        model_path = self.models_dir / model_info.gguf_file
 
         if model_path.exists():
             print(f"✅ Model already downloaded: {model_path}")
@@ -152,10 +165,18 @@ class EngineSetup:
         try:
             from huggingface_hub import hf_hub_download
 
-            print(f"Downloading from {model_info['gguf_repo']}...")
+            # hf_transfer downloads with parallel range requests — a
+            # large speedup on fast links for multi-GB GGUF files
+            try:
+                import hf_transfer  # noqa: F401
+                os.environ.setdefault('HF_HUB_ENABLE_HF_TRANSFER', '1')
+            except ImportError:
+                pass
+
+            print(f"Downloading from {model_info.gguf_repo}...")
             downloaded_path = hf_hub_download(
-                repo_id=model_info['gguf_repo'],
-                filename=model_info['gguf_file'],
+                repo_id=model_info.gguf_repo,
+                filename=model_info.gguf_file,
                 local_dir=str(self.models_dir),
                 local_dir_use_symlinks=False
             )
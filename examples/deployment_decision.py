@@ -17,6 +17,16 @@ import json
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from benchmark_runner import BenchmarkRunner
@@ -134,10 +144,15 @@ def deployment_decision_workflow():
             }
         }
         
-        # Save config
+        # Save config (orjson writes bytes directly and is ~5x faster
+        # than the stdlib pretty-printer)
         config_path = Path('deployment_config.json')
-        with open(config_path, 'w') as f:
-            json.dump(deployment_config, f, indent=2)
+        if orjson:
+            config_path.write_bytes(
+                orjson.dumps(deployment_config, option=orjson.OPT_INDENT_2))
+        else:
+            with open(config_path, 'w') as f:
+                json.dump(deployment_config, f, indent=2)
         
         print(f"\n  📝 Configuration saved to: {config_path}")
         
@@ -206,36 +221,45 @@ def compare_cloud_providers():
     print(f"\nRequired memory: {memory_gb:.1f}GB")
     print(f"\n{'Provider':<10} {'Instance':<20} {'Specs':<30} {'$/hour':<10} {'$/month':<10}")
     print("-" * 80)
-    
-    recommendations = []
-    
-    for provider, instances in providers.items():
-        for instance_name, specs in instances.items():
-            # Check if instance has enough memory
-            if specs['ram'] >= memory_gb * 1.2:  # 20% headroom
-                monthly = specs['cost'] * 24 * 30
-                
-                spec_str = f"{specs['cpu']} CPU, {specs['ram']}GB RAM"
-                if 'gpu' in specs:
-                    spec_str += f", {specs['gpu']}"
-                
-                print(f"{provider:<10} {instance_name:<20} {spec_str:<30} "
-                      f"${specs['cost']:<9.3f} ${monthly:<9.0f}")
-                
-                recommendations.append({
-                    'provider': provider,
-                    'instance': instance_name,
-                    'monthly_cost': monthly,
-                    'has_gpu': 'gpu' in specs
-                })
-    
-    # Show cheapest option
-    cpu_only = [r for r in recommendations if not r['has_gpu']]
+
+    # Flatten the catalog once into rows of
+    # (provider, instance, cpu, ram, cost, has_gpu, gpu)
+    rows = [
+        (provider, instance_name, specs['cpu'], specs['ram'],
+         specs['cost'], 'gpu' in specs, specs.get('gpu', ''))
+        for provider, instances in providers.items()
+        for instance_name, specs in instances.items()
+    ]
+
+    if np is not None:
+        # Filter with boolean masks — C-level loops instead of Python
+        # iteration, which matters once the catalog grows large
+        dt = np.dtype([('provider', 'U10'), ('instance', 'U20'),
+                       ('cpu', 'i4'), ('ram', 'i4'), ('cost', 'f8'),
+                       ('has_gpu', '?'), ('gpu', 'U10')])
+        arr = np.array(rows, dtype=dt)
+        fits = arr[arr['ram'] >= memory_gb * 1.2]  # 20% headroom
+        candidates = [tuple(rec) for rec in fits]
+    else:
+        candidates = [r for r in rows if r[3] >= memory_gb * 1.2]
+
+    for provider, instance_name, cpu, ram, cost, has_gpu, gpu in candidates:
+        monthly = cost * 24 * 30
+
+        spec_str = f"{cpu} CPU, {ram}GB RAM"
+        if has_gpu:
+            spec_str += f", {gpu}"
+
+        print(f"{provider:<10} {instance_name:<20} {spec_str:<30} "
+              f"${cost:<9.3f} ${monthly:<9.0f}")
+
+    # Show cheapest CPU-only option
+    cpu_only = [r for r in candidates if not r[5]]
     if cpu_only:
-        cheapest = min(cpu_only, key=lambda x: x['monthly_cost'])
-        print(f"\n💰 Cheapest CPU-only: {cheapest['provider']} {cheapest['instance']} "
-              f"(${cheapest['monthly_cost']:.0f}/month)")
-    
+        cheapest = min(cpu_only, key=lambda r: r[4])
+        print(f"\n💰 Cheapest CPU-only: {cheapest[0]} {cheapest[1]} "
+              f"(${cheapest[4] * 24 * 30:.0f}/month)")
+
     print()
 
 
@@ -10,19 +10,25 @@ import json
 import sys
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from benchmark_runner import BenchmarkRunner
-from report_generator import ReportGenerator
-
 
 def run_automated_benchmark():
     """
     Run a benchmark and automatically select the best engine
     based on your requirements
     """
-    
+    # Imported here so the regression-check path (run many times per day
+    # in CI) never pays for loading the runner and its heavy deps
+    from benchmark_runner import BenchmarkRunner
+    from report_generator import ReportGenerator
+
     print("🤖 Running automated benchmark...")
     
     # Define your requirements
@@ -62,8 +68,12 @@ def run_automated_benchmark():
         'timestamp': results['metadata']['timestamp']
     }
     
-    with open('deployment_config.json', 'w') as f:
-        json.dump(deployment_config, f, indent=2)
+    if orjson:
+        Path('deployment_config.json').write_bytes(
+            orjson.dumps(deployment_config, option=orjson.OPT_INDENT_2))
+    else:
+        with open('deployment_config.json', 'w') as f:
+            json.dump(deployment_config, f, indent=2)
     
     print(f"\n📝 Deployment config saved to: deployment_config.json")
     
@@ -74,7 +84,8 @@ def compare_models():
     """
     Compare different models to see which performs best
     """
-    
+    from benchmark_runner import BenchmarkRunner
+
     print("🔬 Comparing models...")
     
     models = ['llama-3.1-8b', 'mistral-7b', 'qwen-2.5-7b']
@@ -138,25 +149,32 @@ def check_regression(baseline_file: str, current_file: str, threshold: float = 1
     print(f"   Current: {current_file}")
     print(f"   Threshold: {threshold}%")
     
-    # Load results
-    with open(baseline_file) as f:
-        baseline = json.load(f)
-    
-    with open(current_file) as f:
-        current = json.load(f)
-    
+    # Load results — orjson parses large result files several times
+    # faster, and read_bytes skips Python-level text decoding
+    if orjson:
+        baseline = orjson.loads(Path(baseline_file).read_bytes())
+        current = orjson.loads(Path(current_file).read_bytes())
+    else:
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+
+        with open(current_file) as f:
+            current = json.load(f)
+    
+    # Index baseline rows once — O(N+M) instead of rescanning the
+    # baseline list for every current benchmark
+    baseline_idx = {
+        (b['engine'], b['concurrency']): b
+        for b in baseline['benchmarks']
+    }
+
     # Compare metrics for same engine/concurrency
     regressions = []
-    
+
     for curr_bench in current['benchmarks']:
-        # Find matching baseline benchmark
-        baseline_bench = next(
-            (b for b in baseline['benchmarks'] 
-             if b['engine'] == curr_bench['engine'] 
-             and b['concurrency'] == curr_bench['concurrency']),
-            None
-        )
-        
+        baseline_bench = baseline_idx.get(
+            (curr_bench['engine'], curr_bench['concurrency']))
+
         if not baseline_bench:
             continue
         
@@ -13,7 +13,11 @@ import sys
 import json
 from pathlib import Path
 
-from benchmark_runner import BenchmarkRunner
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from report_generator import ReportGenerator
 from config import SUPPORTED_MODELS, SUPPORTED_ENGINES
 
@@ -107,6 +111,9 @@ def main():
 
 def run_benchmark(args):
     """Run the benchmark suite"""
+    # Deferred so list-models/compare don't pay for the runner's deps
+    from benchmark_runner import BenchmarkRunner
+
     print(f"🦙 llamabench v0.1.0")
     print(f"{'=' * 60}")
     
@@ -154,10 +161,16 @@ def run_benchmark(args):
     try:
         results = runner.run()
         
-        # Save results
+        # Save results — orjson writes large result files several times
+        # faster than the stdlib pretty-printer
         output_path = Path(args.output)
-        with open(output_path, 'w') as f:
-            json.dump(results, f, indent=2)
+        if orjson:
+            output_path.write_bytes(orjson.dumps(
+                results,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(output_path, 'w') as f:
+                json.dump(results, f, indent=2)
         
         print(f"\n💾 Results saved to: {output_path}")
         
@@ -181,9 +194,9 @@ def list_models():
     print("📋 Supported Models:\n")
     for model_id, model_info in SUPPORTED_MODELS.items():
         print(f"  • {model_id}")
-        print(f"    Name: {model_info['name']}")
-        print(f"    Size: {model_info['size']}")
-        print(f"    HuggingFace: {model_info['hf_repo']}")
+        print(f"    Name: {model_info.name}")
+        print(f"    Size: {model_info.size}")
+        print(f"    HuggingFace: {model_info.hf_repo}")
         print()
 
 
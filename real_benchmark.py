@@ -5,11 +5,137 @@ Replaces mock data with actual API calls and metric collection
 
 import asyncio
 import aiohttp
+import functools
+import itertools
 import time
 import json
+from dataclasses import dataclass
 from typing import List, Dict, Any, Optional
-from datetime import datetime
-import statistics
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import httpx  # optional HTTP/2 backend for the vLLM endpoint
+except ImportError:
+    httpx = None
+
+# Drop-in libuv event loop — 2-4x faster on exactly this workload
+# (thousands of concurrent streaming sockets); no API change
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
+# Hot-path JSON decode: orjson takes bytes directly and is several times
+# faster than stdlib; json.loads also accepts bytes, so neither side of
+# the binding needs an explicit decode
+_loads = orjson.loads if orjson else json.loads
+_dumps = orjson.dumps if orjson else (lambda obj: json.dumps(obj).encode())
+
+# Quantile vector shared by every metric family — built once so each
+# aggregation pass makes a single vectorized np.quantile call per array
+_QUANTILES = np.array([0.5, 0.9, 0.95, 0.99]) if np is not None else None
+
+
+@functools.lru_cache(maxsize=4)
+def _get_tokenizer(model_name: str):
+    """Load a HF tokenizer for exact token counts, or None if unavailable"""
+    try:
+        from transformers import AutoTokenizer
+    except ImportError:
+        return None
+
+    # Resolve llamabench model ids to their HF repos when possible
+    repo = model_name
+    try:
+        from config import SUPPORTED_MODELS
+        spec = SUPPORTED_MODELS.get(model_name)
+        if spec:
+            repo = spec.hf_repo
+    except ImportError:
+        pass
+
+    try:
+        return AutoTokenizer.from_pretrained(repo)
+    except Exception:
+        return None
+
+
+def create_benchmark_session(concurrency: int = 1) -> aiohttp.ClientSession:
+    """
+    Build a ClientSession tuned for benchmarking
+
+    Size the connector to the benchmark concurrency — the default limit
+    of 100 would queue requests client-side and pollute TTFT — and keep
+    DNS cached and sockets warm across requests.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=max(concurrency, 100),
+        limit_per_host=0,
+        ttl_dns_cache=300,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=30),
+        json_serialize=(
+            (lambda obj: orjson.dumps(obj).decode()) if orjson
+            else json.dumps),
+    )
+
+
+def _count_tokens(model_name: str, text: str) -> int:
+    """Count tokens with the model's tokenizer, approximating by words
+    when no tokenizer is available"""
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer(model_name)
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    return len(text.split())
+
+
+def _split_timeline(token_times: List[float], start_time: float):
+    """Derive TTFT and inter-token latencies from raw arrival timestamps.
+
+    The stream loops only record time.perf_counter() per token frame;
+    the branch-and-subtract bookkeeping happens here once per request,
+    with np.diff doing the pairwise differences in C when NumPy is
+    present.
+    """
+    if not token_times:
+        return None, []
+    ttft = token_times[0] - start_time
+    if len(token_times) < 2:
+        return ttft, []
+    if np is not None:
+        return ttft, np.diff(token_times)
+    return ttft, [b - a for a, b in itertools.pairwise(token_times)]
+
+
+@dataclass(slots=True)
+class RequestResult:
+    """
+    Outcome of one measured request
+
+    Slots keep each record to a fraction of a dict's footprint, which
+    matters when a long run holds millions of these before aggregation.
+    """
+    ttft: Optional[float]
+    total_time: float
+    tokens: int
+    itls: List[float]
+    success: bool
+    error: Optional[str] = None
 
 
 class RealBenchmarkEngine:
@@ -17,21 +143,62 @@ class RealBenchmarkEngine:
     Handles actual HTTP benchmarking for inference engines
     """
     
-    def __init__(self, engine: str, base_url: str, model_name: str):
+    def __init__(self, engine: str, base_url: str, model_name: str,
+                 concurrency: int = 1,
+                 session: Optional[aiohttp.ClientSession] = None):
+        if engine not in self._PARSERS:
+            raise ValueError(f"Unknown engine: {engine}")
         self.engine = engine
         self.base_url = base_url
         self.model_name = model_name
-        self.session: Optional[aiohttp.ClientSession] = None
-    
+        self.concurrency = concurrency
+        # An externally provided session is borrowed, not owned — the
+        # caller can reuse its warm sockets across concurrency sweeps
+        self.session = session
+        self._owns_session = session is None
+        self._httpx_client = None
+        self._payload_bytes: List[bytes] = []
+
+        # Bind the engine-specific stream parser and request shape once —
+        # the hot path never re-dispatches on the engine string
+        self._parse_stream = self._PARSERS[engine].__get__(self)
+        path, template = self._REQUEST_TEMPLATES[engine]
+        self._url = f"{base_url}{path}"
+        self._payload_template = dict(template)
+        if engine in ('ollama', 'vllm'):
+            self._payload_template['model'] = model_name
+
     async def __aenter__(self):
-        """Create session on enter"""
-        self.session = aiohttp.ClientSession()
+        """Create session on enter (unless one was supplied)"""
+        if self.session is None:
+            self.session = create_benchmark_session(self.concurrency)
+
+        # aiohttp is HTTP/1.1-only: at high concurrency that means one
+        # socket per in-flight request. vLLM's OpenAI endpoint multiplexes
+        # fine over HTTP/2, so use httpx for it when available and fall
+        # back to aiohttp otherwise.
+        if self.engine == 'vllm' and httpx is not None:
+            try:
+                self._httpx_client = httpx.AsyncClient(
+                    http2=True,
+                    timeout=30.0,
+                    limits=httpx.Limits(
+                        max_connections=max(self.concurrency, 100)),
+                )
+            except ImportError:
+                # httpx installed without the h2 extra
+                self._httpx_client = None
+        self._measure = (self._measure_vllm_httpx
+                         if self._httpx_client is not None
+                         else self._measure_aiohttp)
         return self
-    
+
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Close session on exit"""
-        if self.session:
+        """Close session on exit (only if we created it)"""
+        if self.session and self._owns_session:
             await self.session.close()
+        if self._httpx_client is not None:
+            await self._httpx_client.aclose()
     
     async def health_check(self, timeout: int = 5) -> bool:
         """
@@ -53,223 +220,496 @@ class RealBenchmarkEngine:
             print(f"Health check failed: {e}")
             return False
     
-    async def measure_single_request(self, prompt: str) -> Dict[str, Any]:
+    async def measure_single_request(self, prompt_idx: int) -> 'RequestResult':
         """
         Measure a single request with TTFT and total time
-        
+
+        `prompt_idx` indexes the payloads precomputed by `prepare()` —
+        the serialized bytes are reused across every request for that
+        prompt instead of rebuilding and re-encoding the dict each time.
+
         Returns:
             {
                 'ttft': float,  # Time to first token (seconds)
                 'total_time': float,  # Total request time
                 'tokens': int,  # Number of tokens generated
+                'itls': List[float],  # Inter-token latencies (seconds)
                 'success': bool,
                 'error': Optional[str]
             }
+        (as a slotted RequestResult rather than a dict)
         """
+        return await self._measure(prompt_idx)
+
+    async def _measure_aiohttp(self, prompt_idx: int) -> 'RequestResult':
+        """Default HTTP/1.1 measurement path"""
         start_time = time.perf_counter()
-        ttft = None
-        tokens = 0
-        
+
         try:
-            # Build request based on engine type
-            url, payload = self._build_request(prompt)
-            
-            async with self.session.post(url, json=payload, timeout=30) as response:
+            async with self.session.post(
+                    self._url,
+                    data=self._payload_bytes[prompt_idx],
+                    headers=self._JSON_HEADERS,
+                    timeout=30) as response:
                 if response.status != 200:
-                    return {
-                        'ttft': None,
-                        'total_time': time.perf_counter() - start_time,
-                        'tokens': 0,
-                        'success': False,
-                        'error': f"HTTP {response.status}"
-                    }
-                
-                # For streaming responses
-                if self.engine == 'llama.cpp':
-                    async for line in response.content:
-                        if ttft is None:
-                            ttft = time.perf_counter() - start_time
-                        
-                        if line:
-                            try:
-                                data = json.loads(line.decode('utf-8'))
-                                if 'content' in data:
-                                    tokens += 1
-                            except:
-                                pass
-                
-                elif self.engine == 'ollama':
-                    async for line in response.content:
-                        if ttft is None:
-                            ttft = time.perf_counter() - start_time
-                        
-                        if line:
-                            try:
-                                data = json.loads(line.decode('utf-8'))
-                                if 'response' in data:
-                                    tokens += len(data.get('response', '').split())
-                            except:
-                                pass
+                    return RequestResult(
+                        ttft=None,
+                        total_time=time.perf_counter() - start_time,
+                        tokens=0,
+                        itls=[],
+                        success=False,
+                        error=f"HTTP {response.status}")
                 
-                elif self.engine == 'vllm':
-                    # vLLM uses OpenAI-compatible API
-                    data = await response.json()
-                    ttft = time.perf_counter() - start_time  # Non-streaming for now
-                    
-                    if 'choices' in data:
-                        content = data['choices'][0].get('text', '')
-                        tokens = len(content.split())
-            
+                # Engine-specific stream parsing, bound once in __init__.
+                # TTFT is taken at the first frame that actually carries
+                # generated content — raw stream yields can be empty lines
+                # or keep-alive framing, which previously produced
+                # misleading near-zero TTFTs.
+                ttft, tokens, itls = await self._parse_stream(
+                    response, start_time)
+
             total_time = time.perf_counter() - start_time
             
             # If we didn't get TTFT (non-streaming), use total time
             if ttft is None:
                 ttft = total_time
             
-            return {
-                'ttft': ttft,
-                'total_time': total_time,
-                'tokens': tokens if tokens > 0 else 50,  # Estimate if can't count
-                'success': True,
-                'error': None
-            }
-        
+            return RequestResult(
+                ttft=ttft,
+                total_time=total_time,
+                tokens=tokens if tokens > 0 else 50,  # Estimate if can't count
+                itls=itls,
+                success=True)
+
         except asyncio.TimeoutError:
-            return {
-                'ttft': None,
-                'total_time': time.perf_counter() - start_time,
-                'tokens': 0,
-                'success': False,
-                'error': 'Timeout'
-            }
+            return RequestResult(
+                ttft=None,
+                total_time=time.perf_counter() - start_time,
+                tokens=0,
+                itls=[],
+                success=False,
+                error='Timeout')
         except Exception as e:
-            return {
-                'ttft': None,
-                'total_time': time.perf_counter() - start_time,
-                'tokens': 0,
-                'success': False,
-                'error': str(e)
-            }
+            return RequestResult(
+                ttft=None,
+                total_time=time.perf_counter() - start_time,
+                tokens=0,
+                itls=[],
+                success=False,
+                error=str(e))
     
+    async def _measure_vllm_httpx(self, prompt_idx: int) -> 'RequestResult':
+        """vLLM measurement over HTTP/2 — stream IDs on one multiplexed
+        connection instead of a socket per in-flight request"""
+        start_time = time.perf_counter()
+        token_times = []
+        record = token_times.append
+        parts = []
+
+        try:
+            async with self._httpx_client.stream(
+                    'POST', self._url,
+                    content=self._payload_bytes[prompt_idx],
+                    headers=self._JSON_HEADERS) as response:
+                if response.status_code != 200:
+                    return RequestResult(
+                        ttft=None,
+                        total_time=time.perf_counter() - start_time,
+                        tokens=0,
+                        itls=[],
+                        success=False,
+                        error=f"HTTP {response.status_code}")
+
+                async for line in response.aiter_lines():
+                    if not line.startswith('data: '):
+                        continue
+                    frame = line[6:]
+                    if frame == '[DONE]':
+                        break
+                    try:
+                        data = _loads(frame)
+                    except ValueError:
+                        continue
+                    choices = data.get('choices')
+                    text = choices[0].get('text', '') if choices else ''
+                    if text:
+                        record(time.perf_counter())
+                        parts.append(text)
+
+            total_time = time.perf_counter() - start_time
+            ttft, itls = _split_timeline(token_times, start_time)
+            if ttft is None:
+                ttft = total_time
+            tokens = _count_tokens(self.model_name, ''.join(parts))
+
+            return RequestResult(
+                ttft=ttft,
+                total_time=total_time,
+                tokens=tokens if tokens > 0 else 50,
+                itls=itls,
+                success=True)
+
+        except httpx.TimeoutException:
+            return RequestResult(
+                ttft=None,
+                total_time=time.perf_counter() - start_time,
+                tokens=0,
+                itls=[],
+                success=False,
+                error='Timeout')
+        except Exception as e:
+            return RequestResult(
+                ttft=None,
+                total_time=time.perf_counter() - start_time,
+                tokens=0,
+                itls=[],
+                success=False,
+                error=str(e))
+
+    async def _parse_llamacpp(self, response, start_time: float):
+        """Parse llama.cpp native streaming frames"""
+        # The receive loop only timestamps token arrivals; latency math
+        # is deferred to _split_timeline after the stream ends
+        token_times = []
+        record = token_times.append
+        tokens = 0
+        async for line in response.content:
+            # memchr-backed substring scan is ~10x cheaper than
+            # a JSON parse and suffices to spot a token frame
+            if line and b'"content"' in line:
+                record(time.perf_counter())
+                tokens += 1
+        ttft, itls = _split_timeline(token_times, start_time)
+        return ttft, tokens, itls
+
+    async def _parse_ollama(self, response, start_time: float):
+        """Parse Ollama NDJSON streaming frames"""
+        # Accumulate the text and count tokens once at the end —
+        # no per-chunk split() list allocations in the stream loop
+        token_times = []
+        record = token_times.append
+        response_parts = []
+        eval_count = None
+        async for line in response.content:
+            # Skip frames without payload before paying for a parse
+            if not line or (b'"response"' not in line
+                            and b'"done"' not in line):
+                continue
+            try:
+                data = _loads(line)
+            except ValueError:
+                continue
+            piece = data.get('response')
+            if piece:
+                # First non-empty piece, not the metadata frame
+                record(time.perf_counter())
+                response_parts.append(piece)
+            if data.get('done'):
+                # The final frame carries the server's exact count
+                eval_count = data.get('eval_count')
+
+        if eval_count is not None:
+            tokens = eval_count
+        else:
+            tokens = _count_tokens(self.model_name, ''.join(response_parts))
+        ttft, itls = _split_timeline(token_times, start_time)
+        return ttft, tokens, itls
+
+    async def _parse_vllm(self, response, start_time: float):
+        """Parse vLLM's OpenAI-compatible SSE stream ('data: {...}' lines)"""
+        token_times = []
+        record = token_times.append
+        parts = []
+        async for line in response.content:
+            line = line.strip()
+            if not line.startswith(b'data: '):
+                continue
+            frame = line[6:]
+            if frame == b'[DONE]':
+                break
+            try:
+                data = _loads(frame)
+            except ValueError:
+                continue
+            choices = data.get('choices')
+            text = choices[0].get('text', '') if choices else ''
+            if text:
+                record(time.perf_counter())
+                parts.append(text)
+        tokens = _count_tokens(self.model_name, ''.join(parts))
+        ttft, itls = _split_timeline(token_times, start_time)
+        return ttft, tokens, itls
+
+    # Engine dispatch tables — resolved once per instance in __init__
+    # rather than re-compared on every request
+    _PARSERS = {
+        'llama.cpp': _parse_llamacpp,
+        'ollama': _parse_ollama,
+        'vllm': _parse_vllm,
+    }
+
+    _REQUEST_TEMPLATES = {
+        'llama.cpp': ('/completion', {
+            "n_predict": 512,
+            "temperature": 0.7,
+            "stream": True,
+        }),
+        'ollama': ('/api/generate', {
+            "stream": True,
+        }),
+        'vllm': ('/v1/completions', {
+            "max_tokens": 512,
+            "temperature": 0.7,
+            "stream": True,
+        }),
+    }
+
+    _JSON_HEADERS = {'Content-Type': 'application/json'}
+
     def _build_request(self, prompt: str) -> tuple[str, dict]:
         """
-        Build request URL and payload for specific engine
+        Build request URL and payload for the configured engine
         """
-        if self.engine == 'llama.cpp':
-            url = f"{self.base_url}/completion"
-            payload = {
-                "prompt": prompt,
-                "n_predict": 512,
-                "temperature": 0.7,
-                "stream": True,
-            }
-        
-        elif self.engine == 'ollama':
-            url = f"{self.base_url}/api/generate"
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "stream": True,
-            }
-        
-        elif self.engine == 'vllm':
-            url = f"{self.base_url}/v1/completions"
-            payload = {
-                "model": self.model_name,
-                "prompt": prompt,
-                "max_tokens": 512,
-                "temperature": 0.7,
-            }
-        
-        else:
-            raise ValueError(f"Unknown engine: {self.engine}")
-        
-        return url, payload
+        return self._url, {**self._payload_template, "prompt": prompt}
+
+    def prepare(self, prompts: List[str]) -> None:
+        """
+        Serialize the request payload for each prompt once up front
+
+        With only len(prompts) unique prompts cycling through the run,
+        re-encoding the payload dict on every request is pure client-side
+        overhead; the hot path just posts the cached bytes.
+        """
+        self._payload_bytes = [
+            _dumps(self._build_request(p)[1]) for p in prompts
+        ]
     
     async def run_concurrent_benchmark(
         self,
         prompts: List[str],
         concurrency: int,
-        duration: int
+        duration: int,
+        rps: Optional[float] = None,
+        target_requests: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Run benchmark with concurrent requests for specified duration
-        
+
         Args:
             prompts: List of prompts to cycle through
-            concurrency: Number of concurrent requests
-            duration: How long to run (seconds)
-        
+            concurrency: Number of concurrent requests (burst mode), or the
+                cap on in-flight requests (sustained-RPS mode)
+            duration: How long to run (seconds); acts as the cap when
+                `target_requests` is set
+            rps: Target request arrival rate. None (default) keeps the
+                burst behaviour of `concurrency` always-busy workers;
+                setting it decouples the client arrival rate from server
+                concurrency so TTFT reflects prefill cost rather than
+                client-side queueing.
+            target_requests: Stop once this many requests have completed,
+                even if the duration window hasn't elapsed — a sample
+                target gives stable percentiles without oversampling at
+                high concurrency or cutting low-concurrency runs short.
+
         Returns:
             Dictionary with aggregated metrics
         """
-        results = []
-        start_time = time.time()
-        
-        async def worker(worker_id: int):
-            """Worker that sends requests until duration expires"""
+        # Monotonic deadline: immune to wall-clock adjustments and only
+        # one clock read per loop iteration
+        started_at = time.monotonic()
+        deadline = started_at + duration
+
+        self.prepare(prompts)
+        n_prompts = len(prompts)
+
+        if rps is not None:
+            return await self._run_sustained_rps(
+                n_prompts, concurrency, duration, rps, deadline,
+                target_requests)
+
+        completed = 0
+
+        async def worker(worker_id: int) -> List[Dict[str, Any]]:
+            """Worker that sends requests until the deadline passes or
+            the shared completion target is met"""
+            nonlocal completed
+            # Each worker owns its result list — no shared hot object
+            local = []
             prompt_idx = 0
-            while time.time() - start_time < duration:
-                prompt = prompts[prompt_idx % len(prompts)]
-                result = await self.measure_single_request(prompt)
-                results.append(result)
+            while time.monotonic() < deadline and (
+                    target_requests is None or completed < target_requests):
+                result = await self.measure_single_request(
+                    prompt_idx % n_prompts)
+                local.append(result)
+                completed += 1
                 prompt_idx += 1
-        
+            return local
+
         # Start workers
         workers = [asyncio.create_task(worker(i)) for i in range(concurrency)]
-        
-        # Wait for all workers to complete
-        await asyncio.gather(*workers)
-        
-        # Aggregate results
-        return self._aggregate_results(results, duration)
+
+        # Wait for all workers and flatten their per-worker results
+        per_worker = await asyncio.gather(*workers)
+        results = list(itertools.chain.from_iterable(per_worker))
+
+        # Aggregate over actual elapsed time so an early exit doesn't
+        # deflate throughput
+        elapsed = time.monotonic() - started_at
+        return self._aggregate_results(results, elapsed)
+
+    async def _run_sustained_rps(
+        self,
+        n_prompts: int,
+        concurrency: int,
+        duration: int,
+        rps: float,
+        deadline: float,
+        target_requests: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Fire requests at a steady `rps` arrival rate, with at most
+        `concurrency` in flight at once
+        """
+        sem = asyncio.Semaphore(concurrency)
+        results: List[Dict[str, Any]] = []
+        in_flight = 0
+        peak_concurrent = 0
+
+        async def bounded_request(idx: int):
+            nonlocal in_flight, peak_concurrent
+            async with sem:
+                in_flight += 1
+                if in_flight > peak_concurrent:
+                    peak_concurrent = in_flight
+                try:
+                    results.append(await self.measure_single_request(idx))
+                finally:
+                    in_flight -= 1
+
+        interval = 1.0 / rps
+        started_at = time.monotonic()
+        next_fire = started_at
+        prompt_idx = 0
+        tasks = []
+        while time.monotonic() < deadline and (
+                target_requests is None or len(tasks) < target_requests):
+            tasks.append(asyncio.create_task(
+                bounded_request(prompt_idx % n_prompts)))
+            prompt_idx += 1
+            # Schedule against the ideal timeline so a slow iteration
+            # doesn't permanently lower the achieved rate
+            next_fire += interval
+            delay = next_fire - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started_at
+
+        metrics = self._aggregate_results(results, elapsed)
+        metrics['target_rps'] = rps
+        metrics['actual_rps'] = round(len(tasks) / elapsed, 2) if elapsed else 0
+        metrics['peak_concurrent'] = peak_concurrent
+        return metrics
     
-    def _aggregate_results(self, results: List[Dict], duration: int) -> Dict[str, Any]:
+    def _aggregate_results(self, results: List[RequestResult], duration: float) -> Dict[str, Any]:
         """
         Aggregate individual request results into summary metrics
         """
-        successful = [r for r in results if r['success']]
-        failed = [r for r in results if not r['success']]
+        successful = [r for r in results if r.success]
+        failed = [r for r in results if not r.success]
         
         if not successful:
-            return {
+            empty = {
                 'successful_requests': 0,
                 'failed_requests': len(failed),
-                'ttft_p50': 0,
-                'ttft_p95': 0,
-                'ttft_p99': 0,
+                'tpot': 0,
                 'tokens_per_sec': 0,
                 'total_tokens': 0,
                 'error_rate': 1.0,
             }
-        
-        # Extract TTFT values
-        ttfts = [r['ttft'] for r in successful]
-        ttfts.sort()
-        
-        # Calculate percentiles
-        def percentile(data, p):
-            if not data:
-                return 0
-            k = (len(data) - 1) * p / 100
-            f = int(k)
-            c = f + 1 if f < len(data) - 1 else f
-            return data[f] + (k - f) * (data[c] - data[f])
-        
-        ttft_p50 = percentile(ttfts, 50)
-        ttft_p95 = percentile(ttfts, 95)
-        ttft_p99 = percentile(ttfts, 99)
-        
+            for family in ('ttft', 'itl', 'tpot', 'e2el'):
+                for p in ('p50', 'p90', 'p95', 'p99'):
+                    empty[f'{family}_{p}'] = 0
+            return empty
+
+        # Pool inter-token latencies across all successful requests so the
+        # percentiles describe the steady-state token cadence, not just
+        # per-request averages
+        itl_samples = list(itertools.chain.from_iterable(
+            r.itls for r in successful))
+
+        # Sample arrays per metric family: time-to-first-token, pooled
+        # inter-token latency, per-request time-per-output-token over the
+        # decode phase, and end-to-end request latency. p95 alone hides
+        # tail behavior, so each family reports p50/p90/p95/p99.
+        ttfts = [r.ttft for r in successful]
+        e2els = [r.total_time for r in successful]
+        tpots = [(r.total_time - r.ttft) / (r.tokens - 1)
+                 for r in successful if r.tokens > 1]
+
+        # Percentiles — vectorized when NumPy is around, which matters
+        # once long runs collect millions of samples
+        if np is not None:
+            def percentiles(data):
+                if not len(data):
+                    return 0.0, 0.0, 0.0, 0.0
+                # One vectorized quantile call per family: NumPy sorts the
+                # float64 array once in C and interpolates all four points.
+                # Cast back to plain floats so results stay JSON-serializable
+                arr = np.asarray(data, dtype=np.float64)
+                return tuple(float(q) for q in np.quantile(arr, _QUANTILES))
+        else:
+            def _interpolate(data, p):
+                k = (len(data) - 1) * p / 100
+                f = int(k)
+                c = f + 1 if f < len(data) - 1 else f
+                return data[f] + (k - f) * (data[c] - data[f])
+
+            def percentiles(data):
+                if not data:
+                    return 0.0, 0.0, 0.0, 0.0
+                data = sorted(data)
+                return tuple(_interpolate(data, p) for p in (50, 90, 95, 99))
+
+        ttft_p50, ttft_p90, ttft_p95, ttft_p99 = percentiles(ttfts)
+        itl_p50, itl_p90, itl_p95, itl_p99 = percentiles(itl_samples)
+        tpot_p50, tpot_p90, tpot_p95, tpot_p99 = percentiles(tpots)
+        e2el_p50, e2el_p90, e2el_p95, e2el_p99 = percentiles(e2els)
+
+        # Time per output token over the decode phase (everything after
+        # the first token) — the standard TPOT definition
+        decode_time = sum(r.total_time - r.ttft
+                          for r in successful if r.tokens > 1)
+        decode_tokens = sum(r.tokens - 1
+                            for r in successful if r.tokens > 1)
+        tpot = decode_time / decode_tokens if decode_tokens else 0
+
         # Calculate throughput
-        total_tokens = sum(r['tokens'] for r in successful)
+        total_tokens = sum(r.tokens for r in successful)
         tokens_per_sec = total_tokens / duration if duration > 0 else 0
-        
+
         return {
             'successful_requests': len(successful),
             'failed_requests': len(failed),
             'ttft_p50': round(ttft_p50, 3),
+            'ttft_p90': round(ttft_p90, 3),
             'ttft_p95': round(ttft_p95, 3),
             'ttft_p99': round(ttft_p99, 3),
+            'itl_p50': round(itl_p50, 4),
+            'itl_p90': round(itl_p90, 4),
+            'itl_p95': round(itl_p95, 4),
+            'itl_p99': round(itl_p99, 4),
+            'tpot_p50': round(tpot_p50, 4),
+            'tpot_p90': round(tpot_p90, 4),
+            'tpot_p95': round(tpot_p95, 4),
+            'tpot_p99': round(tpot_p99, 4),
+            'e2el_p50': round(e2el_p50, 3),
+            'e2el_p90': round(e2el_p90, 3),
+            'e2el_p95': round(e2el_p95, 3),
+            'e2el_p99': round(e2el_p99, 3),
+            'tpot': round(tpot, 4),
             'tokens_per_sec': round(tokens_per_sec, 1),
             'total_tokens': total_tokens,
             'error_rate': len(failed) / len(results) if results else 0,
@@ -282,11 +722,14 @@ async def run_real_benchmark(
     model_name: str,
     prompts: List[str],
     concurrency: int,
-    duration: int
+    duration: int,
+    rps: Optional[float] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    target_requests: Optional[int] = None
 ) -> Dict[str, Any]:
     """
     Convenience function to run a complete benchmark
-    
+
     Args:
         engine: Engine type ('llama.cpp', 'ollama', 'vllm')
         base_url: Base URL of the engine (e.g., 'http://localhost:8080')
@@ -294,11 +737,18 @@ async def run_real_benchmark(
         prompts: List of prompts to test with
         concurrency: Number of concurrent requests
         duration: Test duration in seconds
-    
+        rps: Optional sustained arrival rate (None = burst mode)
+        session: Optional shared ClientSession — pass the same one across
+            a concurrency sweep to keep sockets and DNS cache warm
+        target_requests: Optional completion target — the run ends when
+            either this many requests finish or `duration` elapses
+
     Returns:
         Benchmark results dictionary
     """
-    async with RealBenchmarkEngine(engine, base_url, model_name) as bench:
+    async with RealBenchmarkEngine(engine, base_url, model_name,
+                                   concurrency=concurrency,
+                                   session=session) as bench:
         # Health check first
         print(f"  Checking {engine} health...")
         healthy = await bench.health_check()
@@ -310,7 +760,9 @@ async def run_real_benchmark(
         print(f"  ✅ {engine} is healthy")
         print(f"  Running benchmark for {duration}s at {concurrency}x concurrency...")
         
-        results = await bench.run_concurrent_benchmark(prompts, concurrency, duration)
+        results = await bench.run_concurrent_benchmark(
+            prompts, concurrency, duration, rps=rps,
+            target_requests=target_requests)
         return results
 
 
@@ -321,13 +773,14 @@ def run_benchmark_sync(
     model_name: str,
     prompts: List[str],
     concurrency: int,
-    duration: int
+    duration: int,
+    rps: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Synchronous wrapper for async benchmark function
     """
     return asyncio.run(run_real_benchmark(
-        engine, base_url, model_name, prompts, concurrency, duration
+        engine, base_url, model_name, prompts, concurrency, duration, rps=rps
     ))
 
 
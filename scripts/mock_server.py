@@ -12,29 +12,98 @@ Then run llamabench against http://localhost:8080
 """
 
 import asyncio
+import functools
 import json
+import signal
 from aiohttp import web
 import random
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+
+async def _read_json(request):
+    """Decode a request body with orjson when available — aiohttp's
+    request.json() always routes through the stdlib decoder"""
+    body = await request.read()
+    if not body:
+        return {}
+    return orjson.loads(body) if orjson else json.loads(body)
+
+
+def _json_response(payload, status=200):
+    """json_response with orjson's C encoder when available — keeps the
+    mock server's per-request CPU out of the stdlib JSON formatter"""
+    if orjson:
+        return web.Response(body=orjson.dumps(payload),
+                            content_type='application/json',
+                            status=status)
+    return web.json_response(payload, status=status)
+
+
+@functools.lru_cache(maxsize=32)
+def _token_text(n):
+    """Non-streaming response body for a given length — benchmarks
+    request the same n_predict/max_tokens over and over, so build the
+    joined string once per length instead of per request"""
+    return ' '.join(f'token_{i}' for i in range(n))
+
+
+@functools.lru_cache(maxsize=8)
+def _completion_chunks(n_predict):
+    """Pre-serialized llama.cpp-style stream frames for a given length —
+    encoding the same chunk shape thousands of times per request would
+    have the mock server skew the latencies it exists to simulate"""
+    if n_predict <= 0:
+        return ()
+    chunks = [b'{"content":"token_%d ","stop":false}\n' % i
+              for i in range(n_predict - 1)]
+    chunks.append(b'{"content":"token_%d ","stop":true}\n' % (n_predict - 1))
+    return tuple(chunks)
+
+
+@functools.lru_cache(maxsize=8)
+def _generate_chunks(n_tokens):
+    """Pre-serialized Ollama-style stream frames for a given length"""
+    if n_tokens <= 0:
+        return ()
+    chunks = [b'{"response":"word_%d ","done":false}\n' % i
+              for i in range(n_tokens - 1)]
+    chunks.append(b'{"response":"word_%d ","done":true}\n' % (n_tokens - 1))
+    return tuple(chunks)
+
 
 class MockInferenceServer:
     """Mock server that simulates inference engine behavior"""
     
-    def __init__(self, port=8080, latency_ms=150, tokens_per_sec=40):
+    def __init__(self, port=8080, latency_ms=150, tokens_per_sec=40,
+                 batch=16):
         self.port = port
         self.latency_ms = latency_ms  # Simulated TTFT
         self.tokens_per_sec = tokens_per_sec
+        # Tokens emitted per write: one sleep per token means hundreds of
+        # event-loop wakeups per request at high simulated speeds, so
+        # pace in batches and sleep once per batch instead
+        self.batch = max(1, batch)
         self.request_count = 0
     
     async def health(self, request):
         """Health check endpoint"""
-        return web.json_response({"status": "ok"})
+        return _json_response({"status": "ok"})
     
     async def completion(self, request):
         """Simulated completion endpoint (llama.cpp style)"""
         try:
-            data = await request.json()
+            data = await _read_json(request)
             prompt = data.get('prompt', '')
             n_predict = data.get('n_predict', 100)
             stream = data.get('stream', False)
@@ -48,34 +117,33 @@ class MockInferenceServer:
                 response.headers['Content-Type'] = 'application/json'
                 await response.prepare(request)
                 
-                # Generate tokens
-                for i in range(n_predict):
-                    chunk = {
-                        'content': f'token_{i} ',
-                        'stop': i == n_predict - 1
-                    }
-                    await response.write(json.dumps(chunk).encode() + b'\n')
-                    
+                # Generate tokens (frames pre-serialized per length),
+                # batching writes so pacing costs one wakeup per batch
+                chunks = _completion_chunks(n_predict)
+                batch = self.batch
+                for start in range(0, len(chunks), batch):
+                    group = chunks[start:start + batch]
+                    await response.write(b''.join(group))
+
                     # Simulate token generation speed
-                    await asyncio.sleep(1 / self.tokens_per_sec)
+                    await asyncio.sleep(len(group) / self.tokens_per_sec)
                 
                 await response.write_eof()
                 return response
             else:
                 # Non-streaming response
-                content = ' '.join([f'token_{i}' for i in range(n_predict)])
-                return web.json_response({
-                    'content': content,
+                return _json_response({
+                    'content': _token_text(n_predict),
                     'tokens_generated': n_predict
                 })
         
         except Exception as e:
-            return web.json_response({'error': str(e)}, status=500)
+            return _json_response({'error': str(e)}, status=500)
     
     async def generate(self, request):
         """Simulated generate endpoint (Ollama style)"""
         try:
-            data = await request.json()
+            data = await _read_json(request)
             prompt = data.get('prompt', '')
             stream = data.get('stream', False)
             
@@ -87,30 +155,30 @@ class MockInferenceServer:
                 response.headers['Content-Type'] = 'application/json'
                 await response.prepare(request)
                 
-                # Generate tokens
-                for i in range(100):
-                    chunk = {
-                        'response': f'word_{i} ',
-                        'done': i == 99
-                    }
-                    await response.write(json.dumps(chunk).encode() + b'\n')
-                    await asyncio.sleep(1 / self.tokens_per_sec)
+                # Generate tokens (frames pre-serialized per length),
+                # batching writes so pacing costs one wakeup per batch
+                chunks = _generate_chunks(100)
+                batch = self.batch
+                for start in range(0, len(chunks), batch):
+                    group = chunks[start:start + batch]
+                    await response.write(b''.join(group))
+                    await asyncio.sleep(len(group) / self.tokens_per_sec)
                 
                 await response.write_eof()
                 return response
             else:
-                return web.json_response({
+                return _json_response({
                     'response': 'Generated response text',
                     'done': True
                 })
         
         except Exception as e:
-            return web.json_response({'error': str(e)}, status=500)
+            return _json_response({'error': str(e)}, status=500)
     
     async def openai_completion(self, request):
         """Simulated OpenAI-compatible endpoint (vLLM style)"""
         try:
-            data = await request.json()
+            data = await _read_json(request)
             prompt = data.get('prompt', '')
             max_tokens = data.get('max_tokens', 100)
             
@@ -118,9 +186,9 @@ class MockInferenceServer:
             await asyncio.sleep(self.latency_ms / 1000)
             await asyncio.sleep(max_tokens / self.tokens_per_sec)
             
-            return web.json_response({
+            return _json_response({
                 'choices': [{
-                    'text': ' '.join([f'token_{i}' for i in range(max_tokens)]),
+                    'text': _token_text(max_tokens),
                     'finish_reason': 'stop'
                 }],
                 'usage': {
@@ -129,11 +197,11 @@ class MockInferenceServer:
             })
         
         except Exception as e:
-            return web.json_response({'error': str(e)}, status=500)
+            return _json_response({'error': str(e)}, status=500)
     
     async def stats(self, request):
         """Stats endpoint"""
-        return web.json_response({
+        return _json_response({
             'requests_served': self.request_count,
             'latency_ms': self.latency_ms,
             'tokens_per_sec': self.tokens_per_sec
@@ -182,12 +250,24 @@ class MockInferenceServer:
         print()
         print(f"Press Ctrl+C to stop")
         print(f"{'=' * 60}")
-        
-        # Keep running
+
+        # Run until SIGINT/SIGTERM, then tear the runner down properly so
+        # in-flight connections are closed instead of dropped
+        loop = asyncio.get_running_loop()
+        stop = loop.create_future()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set_result, None)
+            except (NotImplementedError, RuntimeError):
+                # Not available on Windows event loops
+                pass
+
         try:
-            await asyncio.Event().wait()
+            await stop
         except asyncio.CancelledError:
             pass
+        finally:
+            await runner.cleanup()
 
 
 async def main():
@@ -198,13 +278,16 @@ async def main():
     parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
     parser.add_argument('--latency', type=int, default=150, help='Simulated latency in ms')
     parser.add_argument('--speed', type=int, default=40, help='Tokens per second')
-    
+    parser.add_argument('--batch', type=int, default=16,
+                        help='Tokens per write in streaming responses')
+
     args = parser.parse_args()
-    
+
     server = MockInferenceServer(
         port=args.port,
         latency_ms=args.latency,
-        tokens_per_sec=args.speed
+        tokens_per_sec=args.speed,
+        batch=args.batch
     )
     
     try:
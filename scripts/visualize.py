@@ -6,37 +6,88 @@ Usage:
     python scripts/visualize.py benchmark_results.json
 """
 
+import functools
 import json
+import os
 import sys
-from pathlib import Path
+from itertools import groupby
+from operator import itemgetter
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@functools.lru_cache(maxsize=4)
+def _load_results(path, mtime):
+    """Parse a results file once per (path, mtime) — running both the
+    chart and markdown views shouldn't pay for two parses, and orjson
+    decodes multi-MB result files several times faster than stdlib"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def load_results(path):
+    """Load benchmark results with mtime-aware caching"""
+    return _load_results(path, os.path.getmtime(path))
+
+
+_HASH70 = '#' * 70
+
+
+def _success_rate(bench):
+    """Success percentage for one row, cached on the dict and safe for
+    zero-request rows (mirrors ReportGenerator's annotation)"""
+    rate = bench.get('_success_rate')
+    if rate is None:
+        metrics = bench['metrics']
+        total = metrics['successful_requests'] + metrics['failed_requests']
+        rate = metrics['successful_requests'] / total * 100 if total else 0.0
+        bench['_success_rate'] = rate
+    return rate
+
+# Every bar width up to 255 chars, built once — indexing this is cheaper
+# than allocating a fresh '█' * n string per chart row
+_BAR_CACHE = ['█' * i for i in range(256)]
+
+
+def _bar(width):
+    """Bar string for a given width, from the precomputed table"""
+    if 0 <= width < len(_BAR_CACHE):
+        return _BAR_CACHE[width]
+    return '█' * width
+
+
+def create_ascii_chart(labels, values, unit, title, max_width=60):
+    """Create a simple ASCII bar chart from parallel label/value
+    sequences (plain lists or NumPy arrays)"""
 
-def create_ascii_chart(data, title, max_width=60):
-    """Create a simple ASCII bar chart"""
-    
     print(f"\n{title}")
     print("=" * max_width)
-    
+
     # Find max value for scaling
-    max_val = max(item['value'] for item in data)
-    
-    for item in data:
-        label = item['label']
-        value = item['value']
-        unit = item.get('unit', '')
-        
+    max_val = max(values)
+
+    # Pre-format the value column so the row loop is pure output
+    value_strs = [
+        f"{v:.2f}" if isinstance(v, float) else str(v)
+        for v in values
+    ]
+
+    for label, value, value_str in zip(labels, values, value_strs):
         # Calculate bar width
         bar_width = int((value / max_val) * (max_width - 25))
-        bar = '█' * bar_width
-        
-        # Format value
-        if isinstance(value, float):
-            value_str = f"{value:.2f}"
-        else:
-            value_str = str(value)
-        
+        bar = _bar(bar_width)
+
         print(f"{label:<15} {bar} {value_str} {unit}")
-    
+
     print()
 
 
@@ -44,88 +95,89 @@ def visualize_results(results_file):
     """Generate ASCII visualizations from benchmark results"""
     
     print(f"📊 Visualizing: {results_file}")
-    
-    with open(results_file) as f:
-        results = json.load(f)
+
+    results = load_results(results_file)
     
     benchmarks = results['benchmarks']
-    
-    # Group by concurrency level
-    concurrency_levels = sorted(set(b['concurrency'] for b in benchmarks))
-    
+
+    # The three per-level charts differ only in which metric they plot and
+    # which direction sorts best-first
+    charts = (
+        ('ttft_p50', 's', "Time to First Token (lower is better)", False),
+        ('tokens_per_sec', 'tok/s', "Throughput (higher is better)", True),
+        ('memory_mb', 'MB', "Memory Usage (lower is better)", False),
+    )
+
+    # Extract metric columns once — per-level views are then boolean
+    # masks and argsorts instead of dict-building comprehensions
+    if np is not None:
+        engine_col = np.array([b['engine'] for b in benchmarks])
+        concurrency_col = np.array([b['concurrency'] for b in benchmarks])
+        metric_cols = {
+            key: np.array([b['metrics'][key] for b in benchmarks])
+            for key, _, _, _ in charts
+        }
+
+    # Group by concurrency level: one sort + linear groupby instead of
+    # re-filtering the full list per level
+    by_concurrency = itemgetter('concurrency')
+    level_map = {
+        concurrency: list(group)
+        for concurrency, group in groupby(
+            sorted(benchmarks, key=by_concurrency), key=by_concurrency)
+    }
+    concurrency_levels = sorted(level_map)
+
     for concurrency in concurrency_levels:
-        print(f"\n{'#' * 70}")
+        print(f"\n{_HASH70}")
         print(f"# Concurrency: {concurrency}")
-        print(f"{'#' * 70}")
-        
-        level_benchmarks = [b for b in benchmarks if b['concurrency'] == concurrency]
-        
-        # TTFT chart
-        ttft_data = [
-            {
-                'label': b['engine'],
-                'value': b['metrics']['ttft_p50'],
-                'unit': 's'
-            }
-            for b in level_benchmarks
-        ]
-        ttft_data.sort(key=lambda x: x['value'])  # Lower is better
-        create_ascii_chart(ttft_data, "Time to First Token (lower is better)", max_width=60)
-        
-        # Throughput chart
-        throughput_data = [
-            {
-                'label': b['engine'],
-                'value': b['metrics']['tokens_per_sec'],
-                'unit': 'tok/s'
-            }
-            for b in level_benchmarks
-        ]
-        throughput_data.sort(key=lambda x: x['value'], reverse=True)  # Higher is better
-        create_ascii_chart(throughput_data, "Throughput (higher is better)", max_width=60)
-        
-        # Memory chart
-        memory_data = [
-            {
-                'label': b['engine'],
-                'value': b['metrics']['memory_mb'],
-                'unit': 'MB'
-            }
-            for b in level_benchmarks
-        ]
-        memory_data.sort(key=lambda x: x['value'])  # Lower is better
-        create_ascii_chart(memory_data, "Memory Usage (lower is better)", max_width=60)
+        print(f"{_HASH70}")
+
+        if np is not None:
+            mask = concurrency_col == concurrency
+            labels = engine_col[mask]
+            for key, unit, title, reverse in charts:
+                values = metric_cols[key][mask]
+                order = np.argsort(values)
+                if reverse:
+                    order = order[::-1]
+                create_ascii_chart(labels[order], values[order].tolist(),
+                                   unit, title, max_width=60)
+        else:
+            level_benchmarks = level_map[concurrency]
+            for key, unit, title, reverse in charts:
+                rows = sorted(
+                    ((b['metrics'][key], b['engine'])
+                     for b in level_benchmarks),
+                    reverse=reverse)
+                create_ascii_chart([r[1] for r in rows],
+                                   [r[0] for r in rows],
+                                   unit, title, max_width=60)
     
     # Scalability chart - show how throughput scales with concurrency
-    print(f"\n{'#' * 70}")
+    print(f"\n{_HASH70}")
     print(f"# Throughput Scalability")
-    print(f"{'#' * 70}")
+    print(f"{_HASH70}")
     
-    engines = sorted(set(b['engine'] for b in benchmarks))
-    
-    for engine in engines:
+    # One sort by (engine, concurrency) yields both the per-engine groups
+    # and the concurrency ordering inside each group
+    for engine, group in groupby(
+            sorted(benchmarks, key=itemgetter('engine', 'concurrency')),
+            key=itemgetter('engine')):
         print(f"\n{engine}:")
-        engine_data = [
-            {
-                'label': f"  {b['concurrency']}x",
-                'value': b['metrics']['tokens_per_sec'],
-                'unit': 'tok/s'
-            }
-            for b in benchmarks if b['engine'] == engine
-        ]
-        engine_data.sort(key=lambda x: int(x['label'].strip().replace('x', '')))
-        
-        for item in engine_data:
-            bar_width = int((item['value'] / 500) * 40)  # Scale to reasonable width
-            bar = '█' * bar_width
-            print(f"{item['label']:<8} {bar} {item['value']:.1f} {item['unit']}")
+
+        for b in group:
+            label = f"  {b['concurrency']}x"
+            value = b['metrics']['tokens_per_sec']
+            bar_width = int((value / 500) * 40)  # Scale to reasonable width
+            bar = _bar(bar_width)
+            print(f"{label:<8} {bar} {value:.1f} tok/s")
 
 
 def create_markdown_table(results_file):
     """Create a markdown table for easy sharing"""
-    
-    with open(results_file) as f:
-        results = json.load(f)
+
+    results = load_results(results_file)
     
     benchmarks = results['benchmarks']
     model = results['metadata']['model']
@@ -134,11 +186,10 @@ def create_markdown_table(results_file):
     print("| Engine | Concurrency | TTFT (p50) | Throughput | Memory | Success Rate |")
     print("|--------|-------------|------------|------------|--------|--------------|")
     
-    for bench in sorted(benchmarks, key=lambda x: (x['concurrency'], x['engine'])):
+    for bench in sorted(benchmarks, key=itemgetter('concurrency', 'engine')):
         metrics = bench['metrics']
-        success_rate = (metrics['successful_requests'] / 
-                       (metrics['successful_requests'] + metrics['failed_requests'])) * 100
-        
+        success_rate = _success_rate(bench)
+
         print(f"| {bench['engine']:<10} | "
               f"{bench['concurrency']:<11} | "
               f"{metrics['ttft_p50']:.3f}s | "
@@ -157,7 +208,7 @@ if __name__ == '__main__':
     
     results_file = sys.argv[1]
     
-    if not Path(results_file).exists():
+    if not os.path.exists(results_file):
         print(f"Error: File not found: {results_file}")
         sys.exit(1)
     